@@ -1,12 +1,14 @@
 import pandas as pd
-from pathlib import Path
 import matplotlib.pyplot as plt
 
+from sampling import estimate_totals
+from utils import stage_path
+
 # Paths
-INPUT_PATH = Path("data/processed/uber_eats_bertopic_labeled.csv")
-OUTPUT_STATS_PATH = Path("data/processed/topic_summary_stats.csv")
-OUTPUT_TRENDS_PATH = Path("data/processed/topic_trends_monthly.csv")
-VISUALS_PATH = Path("visuals")
+INPUT_PATH = stage_path("data/processed/uber_eats_bertopic_labeled.csv")
+OUTPUT_STATS_PATH = stage_path("data/processed/topic_summary_stats.csv")
+OUTPUT_TRENDS_PATH = stage_path("data/processed/topic_trends_monthly.csv")
+VISUALS_PATH = stage_path("visuals")
 
 def main():
     print("Loading labeled review data...")
@@ -17,15 +19,23 @@ def main():
         df["at"] = pd.to_datetime(df["at"], errors="coerce")
     df = df.dropna(subset=["at"])
 
+    # Sampled runs carry sample_weight, so counts are estimates of the full corpus
+    weighted = "sample_weight" in df.columns
+    if weighted:
+        print("Sampled input detected: reporting weighted estimates with 95% confidence intervals.")
+
     # A. Prevalence
-    prevalence = (
-        df.groupby("pain_point_label")
-        .size()
-        .reset_index(name="count")
-        .sort_values("count", ascending=False)
-    )
-    total = prevalence["count"].sum()
-    prevalence["percent"] = prevalence["count"] / total * 100
+    if weighted:
+        prevalence = estimate_totals(df, ["pain_point_label"]).sort_values("count", ascending=False)
+    else:
+        prevalence = (
+            df.groupby("pain_point_label")
+            .size()
+            .reset_index(name="count")
+            .sort_values("count", ascending=False)
+        )
+        total = prevalence["count"].sum()
+        prevalence["percent"] = prevalence["count"] / total * 100
 
     OUTPUT_STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
     prevalence.to_csv(OUTPUT_STATS_PATH, index=False)
@@ -58,7 +68,11 @@ def main():
 
     # B. Temporal trends
     df["month"] = df["at"].dt.to_period("M")
-    trends = df.groupby(["month", "pain_point_label"]).size().reset_index(name="count")
+    if weighted:
+        trends = estimate_totals(df, ["month", "pain_point_label"])
+        trends = trends[["month", "pain_point_label", "count", "count_ci_low", "count_ci_high"]]
+    else:
+        trends = df.groupby(["month", "pain_point_label"]).size().reset_index(name="count")
     trends["month"] = trends["month"].dt.to_timestamp()
     trends.to_csv(OUTPUT_TRENDS_PATH, index=False)
     print(f"Saved monthly trends to {OUTPUT_TRENDS_PATH}")
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+OUTPUT_PATH = Path("data/processed/thread_budget_benchmark.csv")
+
+DEFAULT_BUDGETS = [1, 2, 4, os.cpu_count() or 1]
+DEFAULT_LIMIT = 5000  # reviews per run, keeps each budget to a few minutes
+
+
+def process_tree_cpu_times(process) -> dict:
+    """
+    CPU seconds used by this process and its children, keyed by pid.
+    HDBSCAN's core-distance jobs run in joblib worker processes, so their
+    time does not show up in the parent's own CPU counters.
+    """
+    times = process.cpu_times()
+    # children that already exited and were reaped count toward this process
+    usage = {process.pid: times.user + times.system + times.children_user + times.children_system}
+    for child in process.children(recursive=True):
+        try:
+            child_times = child.cpu_times()
+        except psutil.NoSuchProcess:
+            continue
+        usage[child.pid] = child_times.user + child_times.system
+    return usage
+
+
+def run_worker(limit: int, umap_deterministic: bool, low_memory: bool):
+    """Fit the first-pass model once and print wall and CPU time as JSON."""
+    # bertopic_model applies PIPELINE_THREADS before importing numpy/torch
+    import bertopic_model
+    import pandas as pd
+
+    texts = pd.read_csv(bertopic_model.INPUT_PATH)["processed_content"].astype(str).tolist()[:limit]
+    settings = dict(
+        bertopic_model.THREAD_SETTINGS,
+        umap_deterministic=umap_deterministic,
+        low_memory=low_memory,
+    )
+    topic_model = bertopic_model.build_topic_model(settings)
+
+    process = psutil.Process()
+    wall_start, cpu_start = time.perf_counter(), process_tree_cpu_times(process)
+    topic_model.fit_transform(texts)
+    wall = time.perf_counter() - wall_start
+    cpu_end = process_tree_cpu_times(process)
+    cpu = sum(seconds - cpu_start.get(pid, 0.0) for pid, seconds in cpu_end.items())
+
+    print(json.dumps({"threads": settings["threads"], "reviews": len(texts), "wall_s": wall, "cpu_s": cpu}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bertopic_model.py at different thread budgets.")
+    parser.add_argument("--budgets", type=int, nargs="+", default=DEFAULT_BUDGETS)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--umap-deterministic", action="store_true")
+    parser.add_argument("--low-memory", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.limit, args.umap_deterministic, args.low_memory)
+        return
+
+    import pandas as pd
+
+    rows = []
+    for threads in sorted(set(args.budgets)):
+        print(f"Running with a budget of {threads} threads on {args.limit} reviews...")
+        # each budget runs in a fresh process since thread pools are fixed at import
+        env = dict(os.environ, PIPELINE_THREADS=str(threads))
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", "--limit", str(args.limit)]
+        if args.umap_deterministic:
+            cmd.append("--umap-deterministic")
+        if args.low_memory:
+            cmd.append("--low-memory")
+        result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(result.stderr)
+            raise SystemExit(f"Benchmark worker failed with exit code {result.returncode} at {threads} threads")
+
+        row = json.loads(result.stdout.strip().splitlines()[-1])
+        row["cores_busy"] = row["cpu_s"] / row["wall_s"]
+        row["cpu_utilisation_pct"] = row["cores_busy"] / threads * 100
+        rows.append(row)
+        print(f"  wall {row['wall_s']:.1f}s, cpu {row['cpu_s']:.1f}s, {row['cpu_utilisation_pct']:.0f}% of budget")
+
+    results = pd.DataFrame(rows)
+    results["umap_deterministic"] = args.umap_deterministic
+    results["low_memory"] = args.low_memory
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(OUTPUT_PATH, index=False)
+    print(f"\n{results.to_string(index=False)}")
+    print(f"Saved benchmark results to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,28 @@
-import pandas as pd
-from pathlib import Path
-from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
-from sklearn.feature_extraction.text import CountVectorizer
+from utils import build_cluster_models, configure_threads, limit_torch_threads, stage_path
+
+# thread budget must be exported before numpy/torch/numba are imported
+THREAD_SETTINGS = configure_threads("bertopic_model")
+
+import pandas as pd  # noqa: E402
+from bertopic import BERTopic  # noqa: E402
+from sentence_transformers import SentenceTransformer  # noqa: E402
+from sklearn.feature_extraction.text import CountVectorizer  # noqa: E402
+from filters import build_labels, representations_from_model  # noqa: E402
+from topic_quality import save_quality_report  # noqa: E402
 
 # adjust this to your actual preprocessed file name
-INPUT_PATH = Path("data/processed/preprocessed_cleaned_batch.csv")
-TOPIC_ASSIGNMENTS_PATH = Path("data/processed/uber_eats_bertopic_topics.csv")
-TOPIC_INFO_PATH = Path("data/processed/uber_eats_bertopic_topic_info.csv")
+INPUT_PATH = stage_path("data/processed/preprocessed_cleaned_batch.csv")
+TOPIC_ASSIGNMENTS_PATH = stage_path("data/processed/uber_eats_bertopic_topics.csv")
+TOPIC_INFO_PATH = stage_path("data/processed/uber_eats_bertopic_topic_info.csv")
+TOPIC_QUALITY_PATH = stage_path("data/processed/uber_eats_bertopic_topic_quality.csv")
+MODELS_DIR = stage_path("models")
 
+MIN_TOPIC_SIZE = 10
 
-def main():
-    print(f"Loading preprocessed reviews from {INPUT_PATH}...")
-    df = pd.read_csv(INPUT_PATH)
 
-    texts = df["processed_content"].astype(str).tolist()
-    print(f"Number of reviews: {len(texts)}")
+def build_topic_model(settings: dict = THREAD_SETTINGS) -> BERTopic:
+    """Build the first-pass BERTopic model within the stage's thread budget."""
+    limit_torch_threads(settings)
 
     # Same embedding model family as before
     embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
@@ -27,15 +34,30 @@ def main():
         min_df=3                   # ignore super-rare terms
     )
 
-    print("Fitting BERTopic model with custom vectorizer...")
-    topic_model = BERTopic(
+    umap_model, hdbscan_model = build_cluster_models(settings, MIN_TOPIC_SIZE)
+
+    return BERTopic(
         embedding_model=embedding_model,
         vectorizer_model=vectorizer_model,
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model,
+        low_memory=settings["low_memory"],
         verbose=True,
-        min_topic_size=10,         # allow more, smaller topics
-        top_n_words=10             # show 10 words per topic
+        min_topic_size=MIN_TOPIC_SIZE,   # allow more, smaller topics
+        top_n_words=10                   # show 10 words per topic
     )
 
+
+def main():
+    print(f"Loading preprocessed reviews from {INPUT_PATH}...")
+    df = pd.read_csv(INPUT_PATH)
+
+    texts = df["processed_content"].astype(str).tolist()
+    print(f"Number of reviews: {len(texts)}")
+
+    print(f"Fitting BERTopic model with custom vectorizer ({THREAD_SETTINGS['threads']} threads)...")
+    topic_model = build_topic_model()
+
     topics, probs = topic_model.fit_transform(texts)
 
     # Save topic assignments per review
@@ -46,14 +68,18 @@ def main():
 
     # Save topic summary info
     topic_info = topic_model.get_topic_info()
+    labels = build_labels(representations_from_model(topic_model))
+    topic_info["Label"] = topic_info["Topic"].map(labels)
     topic_info.to_csv(TOPIC_INFO_PATH, index=False)
     print(f"Saved topic summary info to {TOPIC_INFO_PATH}")
 
+    # Score coherence, diversity and outlier share for this run
+    save_quality_report(topic_model, texts, topics, TOPIC_QUALITY_PATH)
+
     # Save the model
-    models_dir = Path("models")
-    models_dir.mkdir(exist_ok=True)
-    topic_model.save(models_dir / "uber_eats_bertopic")
-    print(f"Saved BERTopic model to {models_dir / 'uber_eats_bertopic'}")
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    topic_model.save(MODELS_DIR / "uber_eats_bertopic")
+    print(f"Saved BERTopic model to {MODELS_DIR / 'uber_eats_bertopic'}")
 
 
 if __name__ == "__main__":
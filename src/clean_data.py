@@ -1,9 +1,11 @@
 import pandas as pd
 from langdetect import detect, LangDetectException
-from pathlib import Path
 
-RAW_SAMPLE_PATH = Path("data/raw/raw_batch.csv")
-OUT_PATH = Path("data/processed/cleaned_batch.csv")
+from config import NEGATIVE_SCORES
+from utils import stage_path
+
+RAW_SAMPLE_PATH = stage_path("data/raw/raw_batch.csv")
+OUT_PATH = stage_path("data/processed/cleaned_batch.csv")
 
 
 def is_english(text: str) -> bool:
@@ -26,7 +28,7 @@ def clean_reviews(df: pd.DataFrame) -> pd.DataFrame:
     df["content"] = df["content"].fillna("").astype(str).str.strip()
     
     # Filter by star rating (1–3)
-    mask_score = df["score"].between(1, 3)
+    mask_score = df["score"].isin(NEGATIVE_SCORES)
     
     # Filter out empty content
     mask_non_empty = df["content"] != ""
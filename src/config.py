@@ -1,6 +1,33 @@
 TARGET_NEGATIVE_REVIEWS = 20000
 SUPPORTED_LANGUAGES = ["en"]
+NEGATIVE_SCORES = [1, 2, 3]  # star scores kept by clean_data.py
 
 DATA_DIR = "data"
 RAW_DATA_DIR = f"{DATA_DIR}/raw"
-PROCESSED_DATA_DIR = f"{DATA_DIR}/processed"
\ No newline at end of file
+PROCESSED_DATA_DIR = f"{DATA_DIR}/processed"
+
+# CPU thread budget per modeling stage, shared by the encoder (torch),
+# UMAP (numba), HDBSCAN (joblib) and BLAS. threads=None uses every core.
+# umap_deterministic fixes UMAP's random_state, which makes UMAP single threaded.
+# low_memory trades speed for a smaller footprint in UMAP and BERTopic.
+# Set PIPELINE_THREADS in the environment to override threads for every stage.
+THREAD_BUDGETS = {
+    "bertopic_model": {
+        "threads": None,
+        "umap_deterministic": False,
+        "low_memory": False,
+    },
+    "deep_subtopic_clustering": {
+        "threads": None,
+        "umap_deterministic": False,
+        "low_memory": False,
+    },
+}
+UMAP_RANDOM_STATE = 42
+
+# Sample mode: set PIPELINE_SAMPLE=1 to run every surface stage on a stratified
+# sample drawn by src/sampling.py. Inputs and outputs move under data/sample/,
+# visuals/sample/ and models/sample/ so full-corpus results are left untouched.
+SAMPLE_PER_STRATUM = 200   # reviews kept per (month, star score) stratum
+SAMPLE_SEED = 42
+SAMPLE_CHUNK_SIZE = 10000  # raw rows read per streaming chunk
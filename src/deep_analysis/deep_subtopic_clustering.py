@@ -1,8 +1,20 @@
 import os
-import pandas as pd
-from sentence_transformers import SentenceTransformer
-from bertopic import BERTopic
-from sklearn.feature_extraction.text import CountVectorizer
+import sys
+
+# make src/ importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import build_cluster_models, configure_threads, limit_torch_threads  # noqa: E402
+
+# thread budget must be exported before numpy/torch/numba are imported
+THREAD_SETTINGS = configure_threads("deep_subtopic_clustering")
+
+import pandas as pd  # noqa: E402
+from sentence_transformers import SentenceTransformer  # noqa: E402
+from bertopic import BERTopic  # noqa: E402
+from sklearn.feature_extraction.text import CountVectorizer  # noqa: E402
+from filters import apply_labels, build_labels, representations_from_model  # noqa: E402
+from topic_quality import save_quality_report  # noqa: E402
 
 BASE_DIR = r"C:\Users\NutSplitter\Desktop\Uber Eats Pain Point Project"
 INPUT_PATH = os.path.join(BASE_DIR, r"data\deep_analysis\uber_eats_topics_2_7_24_deep_analysis.csv")
@@ -10,44 +22,7 @@ OUTPUT_DIR = os.path.join(BASE_DIR, r"data\deep_analysis")
 
 # topics you are deep diving
 MAIN_TOPICS = [2, 7, 24]
-
-def build_topic_labels(topic_model):
-    """
-    Build a map: subtopic_id -> short human readable label
-    based on the first 3 representative words.
-    """
-    info = topic_model.get_topic_info()
-    label_map = {}
-
-    for _, row in info.iterrows():
-        topic_id = row["Topic"]
-        # skip outlier topic -1 if it exists
-        if topic_id == -1:
-            continue
-
-        rep = row["Representation"]
-        # rep is like "['word1', 'word2', 'word3', ...]" or list depending on version
-        if isinstance(rep, str):
-            # crude but robust parse: strip brackets and split on commas
-            cleaned = rep.strip("[]")
-            words = [w.strip().strip("'\"") for w in cleaned.split(",")]
-        else:
-            words = list(rep)
-
-        top_words = [w for w in words if w][:3]
-        if not top_words:
-            label = f"subtopic_{topic_id}"
-        else:
-            if len(top_words) == 1:
-                label = f"{top_words[0]} related issues"
-            elif len(top_words) == 2:
-                label = f"{top_words[0]} and {top_words[1]} related issues"
-            else:
-                label = f"{top_words[0]}, {top_words[1]} and {top_words[2]} related issues"
-
-        label_map[topic_id] = label
-
-    return label_map
+MIN_SUBTOPIC_SIZE = 8  # smaller to find finer subtopics
 
 def cluster_subtopics_for_topic(df, main_topic_id, embedding_model):
     """
@@ -69,10 +44,15 @@ def cluster_subtopics_for_topic(df, main_topic_id, embedding_model):
         min_df=3
     )
 
+    umap_model, hdbscan_model = build_cluster_models(THREAD_SETTINGS, MIN_SUBTOPIC_SIZE)
+
     topic_model = BERTopic(
         embedding_model=embedding_model,
         vectorizer_model=vectorizer_model,
-        min_topic_size=8,   # smaller to find finer subtopics
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model,
+        low_memory=THREAD_SETTINGS["low_memory"],
+        min_topic_size=MIN_SUBTOPIC_SIZE,
         top_n_words=10,
         verbose=True
     )
@@ -82,9 +62,9 @@ def cluster_subtopics_for_topic(df, main_topic_id, embedding_model):
 
     df_topic["subtopic_id"] = subtopics
 
-    # build labels
-    label_map = build_topic_labels(topic_model)
-    df_topic["subtopic_label"] = df_topic["subtopic_id"].map(label_map).fillna("other / outlier")
+    # build labels with the same labeler as the surface stage
+    labels = build_labels(representations_from_model(topic_model))
+    df_topic["subtopic_label"] = apply_labels(subtopics, labels)
 
     # save per topic file
     filename = f"topic_{main_topic_id}_subtopics.csv"
@@ -93,6 +73,10 @@ def cluster_subtopics_for_topic(df, main_topic_id, embedding_model):
     print(f"Saved subtopics for main topic {main_topic_id} to:")
     print(f"  {out_path}")
 
+    # coherence, diversity and outlier share for this subtopic run
+    quality_path = os.path.join(OUTPUT_DIR, f"topic_{main_topic_id}_subtopic_quality.csv")
+    save_quality_report(topic_model, texts, subtopics, quality_path)
+
     # quick summary
     print("\nSubtopic counts:")
     print(df_topic["subtopic_label"].value_counts())
@@ -106,6 +90,7 @@ def main():
     df["topic"] = pd.to_numeric(df["topic"], errors="coerce")
 
     # load embedding model once
+    limit_torch_threads(THREAD_SETTINGS)
     embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
 
     dfs_with_subtopics = []
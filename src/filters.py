@@ -0,0 +1,72 @@
+import ast
+
+import numpy as np
+import pandas as pd
+
+OUTLIER_TOPIC = -1
+OUTLIER_LABEL = "other / outlier"
+LABEL_WORDS = 3
+
+
+def representations_from_model(topic_model) -> pd.Series:
+    """Return {topic id: [words]} from a fitted BERTopic model as a Series, without going through CSV."""
+    topics = topic_model.get_topics()
+    return pd.Series(
+        {topic_id: [word for word, _ in words] for topic_id, words in topics.items()},
+        dtype=object,
+    ).sort_index()
+
+
+def parse_representations(representations: pd.Series) -> pd.Series:
+    """Turn Representation strings read back from CSV, like "['food', 'cold']", into word lists."""
+    def parse(rep):
+        if isinstance(rep, (list, tuple, np.ndarray)):
+            return [str(w) for w in rep]
+        try:
+            return [str(w) for w in ast.literal_eval(rep)]
+        except (ValueError, SyntaxError):
+            return []
+
+    return representations.map(parse)
+
+
+def build_labels(representations: pd.Series) -> pd.Series:
+    """
+    Label every topic in one pass from its top 3 representative words,
+    e.g. "promo, promotion and promos related issues". The outlier topic
+    gets OUTLIER_LABEL and topics with no words fall back to "topic_<id>", so
+    labels stay unique for filters that select reviews by exact label.
+    """
+    words = representations.map(lambda ws: [w for w in ws if w][:LABEL_WORDS])
+    first, second, third = words.str[0], words.str[1], words.str[2]
+    n_words = words.str.len()
+
+    core = np.select(
+        [n_words == 1, n_words == 2, n_words >= 3],
+        [first, first + " and " + second, first + ", " + second + " and " + third],
+        default="",
+    )
+    labels = pd.Series(core, index=representations.index, dtype=object) + " related issues"
+    empty = (n_words == 0).to_numpy()
+    labels[empty] = "topic_" + labels.index[empty].astype(str)
+    labels[labels.index == OUTLIER_TOPIC] = OUTLIER_LABEL
+    return labels.rename("label")
+
+
+def apply_labels(topic_ids, labels: pd.Series, default: str = OUTLIER_LABEL) -> np.ndarray:
+    """
+    Label each review by indexing a dense lookup array with its topic id.
+    Topic ids missing from labels (or NaN) get the default label.
+    """
+    topic_ids = pd.to_numeric(pd.Series(np.asarray(topic_ids)), errors="coerce")
+    if labels.empty:
+        return np.full(len(topic_ids), default, dtype=object)
+
+    offset = int(labels.index.min())
+    lookup = np.full(int(labels.index.max()) - offset + 2, default, dtype=object)
+    lookup[labels.index.to_numpy(dtype=np.int64) - offset] = labels.to_numpy()
+
+    # out-of-range ids point at the trailing default slot
+    positions = topic_ids.fillna(offset - 1).to_numpy(dtype=np.int64) - offset
+    positions[(positions < 0) | (positions >= len(lookup) - 1)] = len(lookup) - 1
+    return lookup[positions]
@@ -1,49 +1,24 @@
-from pathlib import Path
-import ast
 import pandas as pd
 
+from filters import apply_labels, build_labels, parse_representations
+from utils import stage_path
+
 # Paths aligned with bertopic_model.py
-TOPIC_INFO_PATH = Path("data/processed/uber_eats_bertopic_topic_info.csv")
-INPUT_TOPICS_PATH = Path("data/processed/uber_eats_bertopic_topics.csv")
-OUTPUT_LABELED_PATH = Path("data/processed/uber_eats_bertopic_labeled.csv")
+TOPIC_INFO_PATH = stage_path("data/processed/uber_eats_bertopic_topic_info.csv")
+INPUT_TOPICS_PATH = stage_path("data/processed/uber_eats_bertopic_topics.csv")
+OUTPUT_LABELED_PATH = stage_path("data/processed/uber_eats_bertopic_labeled.csv")
 
 
-def build_topic_map(topic_info_df: pd.DataFrame) -> dict:
+def build_topic_map(topic_info_df: pd.DataFrame) -> pd.Series:
     """
-    Build a mapping from numeric topic id -> human-readable label,
-    using only the top 3 words from the Representation field.
-    No assumptions beyond those words.
+    Build a Series mapping numeric topic id -> human-readable label.
+    Uses the Label column written by bertopic_model.py when present,
+    otherwise labels the Representation column with the shared labeler.
     """
-    def label_from_rep(rep_str: str) -> str:
-        # rep_str is like "['food', 'cold', 'driver', ...]"
-        try:
-            tokens = ast.literal_eval(rep_str)
-            tokens = [str(t) for t in tokens]
-        except Exception:
-            return "general issues"
-
-        # keep up to 3 top words
-        tokens = tokens[:3]
-        if not tokens:
-            return "general issues"
-
-        if len(tokens) == 1:
-            core = tokens[0]
-        elif len(tokens) == 2:
-            core = f"{tokens[0]} and {tokens[1]}"
-        else:
-            core = f"{tokens[0]}, {tokens[1]} and {tokens[2]}"
-
-        # purely descriptive, no extra inference
-        return f"{core} related issues"
-
-    topic_map = {}
-    for _, row in topic_info_df.iterrows():
-        topic_id = int(row["Topic"])
-        rep = row["Representation"]
-        topic_map[topic_id] = label_from_rep(rep)
-
-    return topic_map
+    topic_info_df = topic_info_df.set_index("Topic")
+    if "Label" in topic_info_df.columns:
+        return topic_info_df["Label"].rename("label")
+    return build_labels(parse_representations(topic_info_df["Representation"]))
 
 
 def main():
@@ -54,8 +29,8 @@ def main():
     topic_map = build_topic_map(topic_info_df)
     print(f"Built labels for {len(topic_map)} topics.")
     print("Sample labels:")
-    for k in sorted(list(topic_map.keys()))[:10]:
-        print(f"  Topic {k}: {topic_map[k]}")
+    for k, label in topic_map.sort_index().head(10).items():
+        print(f"  Topic {k}: {label}")
 
     print(f"\nLoading per-review topic assignments from {INPUT_TOPICS_PATH}...")
     df = pd.read_csv(INPUT_TOPICS_PATH)
@@ -72,7 +47,7 @@ def main():
         )
 
     # Map numeric topic id -> human-readable label
-    df["pain_point_label"] = df[topic_col].map(topic_map)
+    df["pain_point_label"] = apply_labels(df[topic_col], topic_map)
 
     # Save labeled file
     OUTPUT_LABELED_PATH.parent.mkdir(parents=True, exist_ok=True)
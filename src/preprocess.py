@@ -1,9 +1,10 @@
 import pandas as pd
 import re
-from pathlib import Path
 
-INPUT_PATH = Path("data/processed/cleaned_batch.csv")
-OUTPUT_PATH = Path("data/processed/preprocessed_cleaned_batch.csv")
+from utils import stage_path
+
+INPUT_PATH = stage_path("data/processed/cleaned_batch.csv")
+OUTPUT_PATH = stage_path("data/processed/preprocessed_cleaned_batch.csv")
 
 
 def clean_text(text: str) -> str:
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import NEGATIVE_SCORES, RAW_DATA_DIR, SAMPLE_CHUNK_SIZE, SAMPLE_PER_STRATUM, SAMPLE_SEED
+
+RAW_PATH = Path(RAW_DATA_DIR) / "raw_batch.csv"
+SAMPLE_RAW_PATH = Path("data/sample/raw/raw_batch.csv")
+
+Z_95 = 1.96
+
+
+def stratum_labels(df: pd.DataFrame) -> pd.Series:
+    """Stratum of each review: review month and star score, e.g. '2024-03|1'."""
+    month = pd.to_datetime(df["at"], errors="coerce").dt.strftime("%Y-%m").fillna("unknown")
+    return month + "|" + df["score"].astype("Int64").astype(str)
+
+
+def draw_stratified_sample(path: Path = RAW_PATH, per_stratum: int = SAMPLE_PER_STRATUM,
+                           seed: int = SAMPLE_SEED, chunk_size: int = SAMPLE_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Draw up to per_stratum reviews from every (month, score) stratum in one
+    streaming pass over the raw CSV, for the star scores clean_reviews keeps.
+
+    Each review gets a random key and every stratum keeps the rows with the
+    smallest keys seen so far (a priority-key reservoir), which gives a uniform
+    sample without replacement within each stratum. Sampled rows carry
+    sample_weight = N_h / n_h plus the stratum sizes needed for variance estimates.
+
+    Reviews with other or missing scores are skipped: clean_reviews never
+    keeps them, so they would only use up sample budget.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir = None
+    stratum_sizes = pd.Series(dtype="int64")
+
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        # a chunk with a blank score is read as float, so normalise before keying strata
+        chunk["score"] = pd.to_numeric(chunk["score"], errors="coerce").astype("Int64")
+        chunk = chunk[chunk["score"].isin(NEGATIVE_SCORES)].copy()
+        chunk["sample_stratum"] = stratum_labels(chunk)
+        chunk["_key"] = rng.random(len(chunk))
+        stratum_sizes = stratum_sizes.add(chunk["sample_stratum"].value_counts(), fill_value=0)
+
+        pool = chunk if reservoir is None else pd.concat([reservoir, chunk])
+        pool = pool.sort_values("_key")
+        reservoir = pool[pool.groupby("sample_stratum").cumcount() < per_stratum]
+
+    # restore raw file order
+    sample = reservoir.sort_index().drop(columns="_key")
+    sample_sizes = sample["sample_stratum"].value_counts()
+    sample["stratum_size"] = sample["sample_stratum"].map(stratum_sizes).astype(int)
+    sample["stratum_sample_size"] = sample["sample_stratum"].map(sample_sizes).astype(int)
+    sample["sample_weight"] = sample["stratum_size"] / sample["stratum_sample_size"]
+    return sample
+
+
+def estimate_totals(df: pd.DataFrame, by: list, z: float = Z_95) -> pd.DataFrame:
+    """
+    Stratified estimates of the number and percent of reviews in each group
+    of `by`, with normal-approximation confidence intervals.
+
+    Counts use the weighted (Horvitz-Thompson) total; percents use the ratio
+    of a group's total to the total over all rows in df, with a linearized
+    variance. Both include the finite population correction. Groups must
+    partition df, e.g. one label per review.
+    """
+    hits = df.groupby(by + ["sample_stratum"]).size().unstack(fill_value=0)
+    strata = df.groupby("sample_stratum")[["stratum_size", "stratum_sample_size"]].first().loc[hits.columns]
+
+    N = strata["stratum_size"].to_numpy(dtype=float)
+    n = strata["stratum_sample_size"].to_numpy(dtype=float)
+    K = hits.to_numpy(dtype=float)            # groups x strata sampled hit counts
+    m = K.sum(axis=0)                         # sampled rows per stratum still in df
+    dof = np.maximum(n - 1, 1)
+    variance_scale = N ** 2 * (1 - n / N) / n
+
+    # totals: indicator variable per group, sum y = sum y^2 = K
+    total = K @ (N / n)
+    total_var = ((K - K ** 2 / n) / dof) @ variance_scale
+
+    # shares: linearize R = T_g / T_all with d = y - R * x, where x = 1 for rows in df
+    grand_total = m @ (N / n)
+    R = (total / grand_total)[:, None]
+    sum_d = K - R * m
+    sum_d2 = K * (1 - R) ** 2 + (m - K) * R ** 2
+    share_var = ((sum_d2 - sum_d ** 2 / n) / dof) @ variance_scale / grand_total ** 2
+
+    total_half = z * np.sqrt(np.maximum(total_var, 0))
+    share_half = z * np.sqrt(np.maximum(share_var, 0)) * 100
+    percent = R.ravel() * 100
+
+    estimates = pd.DataFrame({
+        "count": total,
+        "count_ci_low": np.maximum(total - total_half, 0),
+        "count_ci_high": total + total_half,
+        "percent": percent,
+        "percent_ci_low": np.maximum(percent - share_half, 0),
+        "percent_ci_high": np.minimum(percent + share_half, 100),
+    }, index=hits.index)
+    return estimates.reset_index()
+
+
+def main():
+    print(f"Drawing stratified sample from {RAW_PATH} "
+          f"({SAMPLE_PER_STRATUM} reviews per month and star score {NEGATIVE_SCORES}, seed {SAMPLE_SEED})...")
+    sample = draw_stratified_sample()
+
+    total = int(sample.groupby("sample_stratum")["stratum_size"].first().sum())
+    print(f"Sampled {len(sample)} of {total} eligible reviews across {sample['sample_stratum'].nunique()} strata.")
+
+    SAMPLE_RAW_PATH.parent.mkdir(parents=True, exist_ok=True)
+    sample.to_csv(SAMPLE_RAW_PATH, index=False)
+    print(f"Saved sample to {SAMPLE_RAW_PATH}")
+    print("Run the pipeline with PIPELINE_SAMPLE=1 to use it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocess import clean_text
+from utils import stage_path
+
+# Paths aligned with label_topics.py
+INPUT_LABELED_PATH = stage_path("data/processed/uber_eats_bertopic_labeled.csv")
+INDEX_PATH = stage_path("data/processed/review_index.npz")
+
+NO_TOPIC = -2  # reviews indexed before they were assigned a topic
+
+
+def tokenize_reviews(texts: pd.Series, doc_ids: np.ndarray):
+    """
+    Split processed_content on whitespace and return flat
+    (token codes, doc ids, positions) arrays, one entry per token occurrence,
+    plus the unique tokens the codes point into.
+
+    Tokens are factorized straight from Python strings so only the unique
+    tokens are ever held as strings; a fixed-width array over every token
+    would be sized by the single longest one.
+    """
+    texts = texts.fillna("").astype(str)
+    lengths = texts.str.split().str.len().to_numpy(dtype=np.int64)
+    total = int(lengths.sum())
+    if total == 0:
+        empty = np.array([], dtype=np.uint32)
+        return np.array([], dtype=np.int32), np.array([], dtype=object), empty, empty
+
+    tokens = np.empty(total, dtype=object)
+    tokens[:] = " ".join(texts).split()
+    codes, uniques = pd.factorize(tokens)
+    docs = np.repeat(doc_ids.astype(np.uint32), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = (np.arange(total, dtype=np.int64) - starts).astype(np.uint32)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object), docs, positions
+
+
+def month_ordinals(at: pd.Series) -> np.ndarray:
+    """Encode review timestamps as year * 12 + (month - 1), or -1 if missing."""
+    at = pd.to_datetime(at, errors="coerce")
+    months = at.dt.year * 12 + at.dt.month - 1
+    return months.fillna(-1).astype(np.int32).to_numpy()
+
+
+def content_hashes(texts: pd.Series) -> np.ndarray:
+    """Stable 64-bit hash of each review's processed_content, used to spot edited reviews."""
+    return pd.util.hash_pandas_object(texts.fillna("").astype(str), index=False).to_numpy(dtype=np.uint64)
+
+
+def topic_label_table(df: pd.DataFrame):
+    """Return sorted (topic ids, labels) pairs from a labeled review frame."""
+    if "pain_point_label" not in df.columns:
+        return np.array([], dtype=np.int32), np.array([], dtype=str)
+    pairs = (
+        df[["topic", "pain_point_label"]]
+        .dropna()
+        .drop_duplicates(subset=["topic"])
+        .sort_values("topic")
+    )
+    return pairs["topic"].astype(np.int32).to_numpy(), pairs["pain_point_label"].astype(str).to_numpy(dtype=str)
+
+
+class ReviewIndex:
+    """
+    Positional inverted index over processed_content.
+
+    Postings are kept as flat occurrence arrays sorted by (term, doc, position),
+    so the posting list for term i is the slice term_ptr[i]:term_ptr[i + 1].
+    """
+
+    def __init__(self, terms, term_ptr, occ_doc, occ_pos,
+                 review_ids, doc_hash, doc_topic, doc_month, topic_ids, topic_labels):
+        self.terms = terms
+        self.term_ptr = term_ptr
+        self.occ_doc = occ_doc
+        self.occ_pos = occ_pos
+        self.review_ids = review_ids
+        self.doc_hash = doc_hash
+        self.doc_topic = doc_topic
+        self.doc_month = doc_month
+        self.topic_ids = topic_ids
+        self.topic_labels = topic_labels
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            terms=np.array([], dtype=object),
+            term_ptr=np.zeros(1, dtype=np.int64),
+            occ_doc=np.array([], dtype=np.uint32),
+            occ_pos=np.array([], dtype=np.uint32),
+            review_ids=np.array([], dtype=str),
+            doc_hash=np.array([], dtype=np.uint64),
+            doc_topic=np.array([], dtype=np.int32),
+            doc_month=np.array([], dtype=np.int32),
+            topic_ids=np.array([], dtype=np.int32),
+            topic_labels=np.array([], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        arrays["terms"] = arrays["terms"].astype(object)
+        # indexes saved before content hashes existed get every review re-tokenized
+        arrays.setdefault("doc_hash", np.zeros(len(arrays["review_ids"]), dtype=np.uint64))
+        return cls(**arrays)
+
+    def save(self, path: Path = INDEX_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # terms live as Python strings in memory; only the vocabulary is stored fixed-width
+        arrays = dict(vars(self), terms=self.terms.astype(str))
+        np.savez_compressed(path, **arrays)
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.review_ids)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Sync the index with df: drop reviews no longer in df, (re-)tokenize
+        reviews that are new or whose processed_content changed, and refresh
+        topic and month metadata for every review in df. Returns the number
+        of reviews tokenized.
+        """
+        df = df.drop_duplicates(subset=["reviewId"])
+        incoming_ids = df["reviewId"].astype(str).to_numpy(dtype=str)
+        incoming_hash = content_hashes(df["processed_content"])
+
+        # reviews that dropped out of the labeled file would otherwise keep stale topics,
+        # and edited reviews would keep postings for their old text
+        incoming_row = pd.Index(incoming_ids).get_indexer(self.review_ids)
+        unchanged = incoming_row >= 0
+        unchanged[unchanged] = incoming_hash[incoming_row[unchanged]] == self.doc_hash[unchanged]
+        if not unchanged.all():
+            self._drop_docs(unchanged)
+
+        is_new = ~np.isin(incoming_ids, self.review_ids)
+        new_df = df[is_new]
+
+        # new reviews are appended, so their doc ids follow the existing ones
+        start = self.num_docs
+        new_doc_ids = np.arange(start, start + len(new_df), dtype=np.uint32)
+        self.review_ids = np.concatenate([self.review_ids, incoming_ids[is_new]])
+        self.doc_hash = np.concatenate([self.doc_hash, incoming_hash[is_new]])
+        self.doc_topic = np.concatenate([self.doc_topic, np.full(len(new_df), NO_TOPIC, dtype=np.int32)])
+        self.doc_month = np.concatenate([self.doc_month, np.full(len(new_df), -1, dtype=np.int32)])
+
+        # refresh metadata in case topics were re-fit since the last update
+        order = np.argsort(self.review_ids)
+        rows = order[np.searchsorted(self.review_ids, incoming_ids, sorter=order)]
+        if "topic" in df.columns:
+            topics = pd.to_numeric(df["topic"], errors="coerce").fillna(NO_TOPIC)
+            self.doc_topic[rows] = topics.astype(np.int32).to_numpy()
+            self.topic_ids, self.topic_labels = topic_label_table(df)
+        if "at" in df.columns:
+            self.doc_month[rows] = month_ordinals(df["at"])
+
+        if new_df.empty:
+            return 0
+
+        codes, uniques, docs, positions = tokenize_reviews(new_df["processed_content"], new_doc_ids)
+        self._merge_postings(codes, uniques, docs, positions)
+        return len(new_df)
+
+    def _occurrence_terms(self) -> np.ndarray:
+        """Term id of every occurrence, expanded from term_ptr."""
+        return np.repeat(np.arange(len(self.terms), dtype=np.int32), np.diff(self.term_ptr))
+
+    def _set_postings(self, occ_term, vocab):
+        self.terms = vocab
+        self.term_ptr = np.concatenate([[0], np.cumsum(np.bincount(occ_term, minlength=len(vocab)))]).astype(np.int64)
+
+    def _drop_docs(self, keep: np.ndarray):
+        """Remove docs where keep is False, renumber the rest and prune unused terms."""
+        new_ids = (np.cumsum(keep) - 1).astype(np.uint32)
+        kept_occ = keep[self.occ_doc]
+        occ_term = self._occurrence_terms()[kept_occ]
+
+        # renumbering is monotonic, so (term, doc, position) order is preserved
+        self.occ_doc = new_ids[self.occ_doc[kept_occ]]
+        self.occ_pos = self.occ_pos[kept_occ]
+        self.review_ids = self.review_ids[keep]
+        self.doc_hash = self.doc_hash[keep]
+        self.doc_topic = self.doc_topic[keep]
+        self.doc_month = self.doc_month[keep]
+
+        used = np.bincount(occ_term, minlength=len(self.terms)) > 0
+        term_ids = (np.cumsum(used) - 1).astype(np.int32)
+        self._set_postings(term_ids[occ_term], self.terms[used])
+
+    def _merge_postings(self, codes, uniques, docs, positions):
+        """
+        Merge postings for newly appended docs into the existing ones.
+
+        New docs always have higher ids than existing docs, so within each term
+        the new occurrences go after the old ones. Only the new occurrences are
+        sorted; the old ones are copied into place in one linear pass.
+        """
+        new_terms = uniques[~np.isin(uniques, self.terms)]
+        vocab = np.sort(np.concatenate([self.terms, new_terms]))
+
+        # vocab is a sorted superset of self.terms, so old term order is preserved
+        old_term = np.searchsorted(vocab, self.terms)[self._occurrence_terms()]
+        new_term = np.searchsorted(vocab, uniques)[codes]
+
+        order = np.lexsort((positions, docs, new_term))
+        new_term, docs, positions = new_term[order], docs[order], positions[order]
+
+        old_counts = np.bincount(old_term, minlength=len(vocab))
+        new_counts = np.bincount(new_term, minlength=len(vocab))
+        term_ptr = np.concatenate([[0], np.cumsum(old_counts + new_counts)]).astype(np.int64)
+
+        # destination of each occurrence: start of its term, plus its rank within
+        # the term, shifted past the term's old occurrences for new ones
+        old_rank = np.arange(len(old_term)) - (np.cumsum(old_counts) - old_counts)[old_term]
+        new_rank = np.arange(len(new_term)) - (np.cumsum(new_counts) - new_counts)[new_term]
+        old_dest = term_ptr[old_term] + old_rank
+        new_dest = term_ptr[new_term] + old_counts[new_term] + new_rank
+
+        occ_doc = np.empty(term_ptr[-1], dtype=np.uint32)
+        occ_pos = np.empty(term_ptr[-1], dtype=np.uint32)
+        occ_doc[old_dest], occ_doc[new_dest] = self.occ_doc, docs
+        occ_pos[old_dest], occ_pos[new_dest] = self.occ_pos, positions
+
+        self.occ_doc, self.occ_pos = occ_doc, occ_pos
+        self.terms = vocab
+        self.term_ptr = term_ptr
+
+    def _postings(self, term: str):
+        i = np.searchsorted(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            return np.array([], dtype=np.uint32), np.array([], dtype=np.uint32)
+        lo, hi = self.term_ptr[i], self.term_ptr[i + 1]
+        return self.occ_doc[lo:hi], self.occ_pos[lo:hi]
+
+    def match(self, query: str) -> np.ndarray:
+        """
+        Return sorted doc ids containing the query. Multi-word queries are
+        matched as exact phrases on consecutive positions.
+        """
+        words = clean_text(query).split()
+        if not words:
+            return np.array([], dtype=np.uint32)
+
+        # key each occurrence by (doc, phrase start) and intersect across words
+        keys = None
+        for offset, word in enumerate(words):
+            docs, positions = self._postings(word)
+            valid = positions >= offset
+            word_keys = (docs[valid].astype(np.int64) << 32) | (positions[valid].astype(np.int64) - offset)
+            keys = word_keys if keys is None else np.intersect1d(keys, word_keys, assume_unique=False)
+            if keys.size == 0:
+                break
+
+        return np.unique(keys >> 32).astype(np.uint32)
+
+    def query(self, query: str):
+        """
+        Return (matches, topic_counts, monthly_counts) for a keyword or phrase.
+        """
+        doc_ids = self.match(query)
+        topics = self.doc_topic[doc_ids]
+        label_lookup = dict(zip(self.topic_ids.tolist(), self.topic_labels.tolist()))
+
+        months = self.doc_month[doc_ids]
+        month_start = pd.Series(pd.NaT, index=range(len(doc_ids)), dtype="datetime64[ns]")
+        known = months >= 0
+        if known.any():
+            month_start[known] = pd.to_datetime(
+                pd.DataFrame({"year": months[known] // 12, "month": months[known] % 12 + 1, "day": 1})
+            ).to_numpy()
+
+        matches = pd.DataFrame({
+            "reviewId": self.review_ids[doc_ids],
+            "topic": topics,
+            "pain_point_label": pd.Series(topics).map(label_lookup),
+            "month": month_start,
+        })
+
+        topic_counts = (
+            matches.groupby(["topic", "pain_point_label"], dropna=False)
+            .size()
+            .reset_index(name="count")
+            .sort_values("count", ascending=False)
+        )
+        monthly_counts = (
+            matches.dropna(subset=["month"])
+            .groupby("month")
+            .size()
+            .reset_index(name="count")
+        )
+        return matches, topic_counts, monthly_counts
+
+
+def build_or_update(input_path: Path = INPUT_LABELED_PATH, index_path: Path = INDEX_PATH) -> ReviewIndex:
+    """Load the existing index (if any) and add any newly labeled reviews."""
+    index = ReviewIndex.load(index_path) if index_path.exists() else ReviewIndex.empty()
+
+    print(f"Loading labeled reviews from {input_path}...")
+    df = pd.read_csv(input_path)
+    added = index.update(df)
+    index.save(index_path)
+
+    print(f"Indexed {added} new or changed reviews ({index.num_docs} total, {len(index.terms)} terms).")
+    print(f"Saved review index to {index_path}")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword and phrase search over processed reviews.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="build or incrementally update the index")
+    query_parser = sub.add_parser("query", help="look up a keyword or phrase")
+    query_parser.add_argument("text", help='e.g. "gift card"')
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_or_update()
+        return
+
+    index = ReviewIndex.load(INDEX_PATH)
+    start = time.perf_counter()
+    matches, topic_counts, monthly_counts = index.query(args.text)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"'{args.text}': {len(matches)} matching reviews in {elapsed_ms:.1f} ms\n")
+    print("Hits per topic:")
+    print(topic_counts.to_string(index=False))
+    print("\nHits per month:")
+    print(monthly_counts.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
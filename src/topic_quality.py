@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.feature_extraction.text import CountVectorizer
+
+from filters import OUTLIER_TOPIC, representations_from_model
+
+TOP_N_WORDS = 10
+
+
+def topic_words_from_model(topic_model, top_n: int = TOP_N_WORDS) -> dict:
+    """Return {topic_id: [top words]} from a fitted BERTopic model, excluding outliers."""
+    representations = representations_from_model(topic_model).drop(OUTLIER_TOPIC, errors="ignore")
+    return representations.map(lambda words: [w for w in words[:top_n] if w]).to_dict()
+
+
+def npmi_coherence(topic_words: dict, texts, vectorizer=None) -> pd.Series:
+    """
+    Mean pairwise NPMI of each topic's words, using document co-occurrence.
+
+    One binary document-term matrix is built over just the words that appear
+    in any topic, and all pair counts come from a single sparse X.T @ X product.
+    """
+    topic_ids = list(topic_words)
+    vocab = sorted({w for words in topic_words.values() for w in words})
+    if not topic_ids or not vocab:
+        return pd.Series(dtype=float, name="npmi")
+
+    vectorizer = clone(vectorizer) if vectorizer is not None else CountVectorizer(
+        stop_words="english", ngram_range=(1, 2)
+    )
+    vectorizer.set_params(vocabulary=vocab, binary=True)
+    X = vectorizer.fit_transform(texts).tocsc()
+    n_docs = X.shape[0]
+
+    doc_freq = np.asarray(X.sum(axis=0)).ravel()
+    co_occurrence = (X.T @ X).tocsr()
+
+    # topic x word index matrix, padded with -1 for topics with fewer words
+    n_words = max(len(words) for words in topic_words.values())
+    word_index = {w: i for i, w in enumerate(vocab)}
+    W = np.full((len(topic_ids), n_words), -1, dtype=np.int64)
+    for row, topic_id in enumerate(topic_ids):
+        ids = [word_index[w] for w in topic_words[topic_id]]
+        W[row, :len(ids)] = ids
+
+    first, second = np.triu_indices(n_words, k=1)
+    wi, wj = W[:, first], W[:, second]
+    valid = (wi >= 0) & (wj >= 0)
+
+    p_ij = np.asarray(co_occurrence[wi[valid], wj[valid]]).ravel() / n_docs
+    p_i = doc_freq[wi[valid]] / n_docs
+    p_j = doc_freq[wj[valid]] / n_docs
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmi = np.log(p_ij / (p_i * p_j))
+        npmi = pmi / -np.log(p_ij)
+    # never co-occurring pairs score -1, always co-occurring pairs score 1
+    npmi[p_ij == 0] = -1.0
+    npmi[p_ij == 1] = 1.0
+
+    scores = np.zeros(wi.shape)
+    scores[valid] = npmi
+    n_pairs = valid.sum(axis=1)
+    per_topic = np.where(n_pairs > 0, scores.sum(axis=1) / np.maximum(n_pairs, 1), np.nan)
+    return pd.Series(per_topic, index=topic_ids, name="npmi")
+
+
+def word_exclusivity(topic_words: dict) -> pd.Series:
+    """Share of each topic's top words that appear in no other topic's top words."""
+    exploded = pd.Series(topic_words, dtype=object).explode().dropna()
+    if exploded.empty:
+        return pd.Series(dtype=float, name="unique_word_share")
+    topics_per_word = exploded.groupby(exploded).transform("size")
+    exclusive = (topics_per_word == 1).groupby(level=0).mean()
+    return exclusive.rename("unique_word_share")
+
+
+def topic_diversity(topic_words: dict) -> float:
+    """Unique words across all topics divided by the total number of top words."""
+    all_words = [w for words in topic_words.values() for w in words]
+    return len(set(all_words)) / len(all_words) if all_words else float("nan")
+
+
+def topic_quality_table(topic_words: dict, texts, topics, vectorizer=None) -> pd.DataFrame:
+    """
+    Per-topic quality table: size, share of documents, NPMI coherence and
+    word exclusivity, with the outlier (-1) topic included as its own row.
+    """
+    topics = pd.Series(np.asarray(topics), name="topic")
+    sizes = topics.value_counts().rename("size")
+
+    table = pd.DataFrame(index=pd.Index(sorted(set(sizes.index) | set(topic_words)), name="topic"))
+    table = table.join(sizes).fillna({"size": 0})
+    table["size"] = table["size"].astype(int)
+    table["share"] = table["size"] / len(topics) if len(topics) else np.nan
+    table["top_words"] = pd.Series({t: ", ".join(w) for t, w in topic_words.items()})
+    table = table.join(npmi_coherence(topic_words, texts, vectorizer))
+    table = table.join(word_exclusivity(topic_words))
+    return table.reset_index()
+
+
+def summarize_quality(table: pd.DataFrame, topic_words: dict) -> dict:
+    """Run-level summary: topic count, outlier share, size-weighted NPMI and diversity."""
+    topics = table[table["topic"] != OUTLIER_TOPIC].dropna(subset=["npmi"])
+    weights = topics["size"]
+    return {
+        "n_topics": len(table[table["topic"] != OUTLIER_TOPIC]),
+        "outlier_share": float(table.loc[table["topic"] == OUTLIER_TOPIC, "share"].sum()),
+        "mean_npmi": float(topics["npmi"].mean()) if len(topics) else float("nan"),
+        "weighted_npmi": float(np.average(topics["npmi"], weights=weights)) if weights.sum() else float("nan"),
+        "topic_diversity": topic_diversity(topic_words),
+    }
+
+
+def save_quality_report(topic_model, texts, topics, output_path):
+    """Score a fitted BERTopic run, save its per-topic table and print the summary."""
+    topic_words = topic_words_from_model(topic_model)
+    table = topic_quality_table(topic_words, texts, topics, topic_model.vectorizer_model)
+    summary = summarize_quality(table, topic_words)
+
+    table.to_csv(output_path, index=False)
+    print(f"Saved topic quality table to {output_path}")
+    print(
+        f"Topics: {summary['n_topics']}, outlier share: {summary['outlier_share']:.1%}, "
+        f"mean NPMI: {summary['mean_npmi']:.3f}, diversity: {summary['topic_diversity']:.3f}"
+    )
+    return table, summary
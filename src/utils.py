@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+from config import THREAD_BUDGETS, UMAP_RANDOM_STATE
+
+# Environment variables read by BLAS, OpenMP, numba and tokenizers at import time
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "NUMBA_NUM_THREADS",
+]
+
+
+def configure_threads(stage: str) -> dict:
+    """
+    Resolve the thread budget for a stage and export it to the thread pools.
+    Must be called before numpy, torch or umap are imported.
+    """
+    settings = dict(THREAD_BUDGETS[stage])
+    override = os.environ.get("PIPELINE_THREADS")
+    if override:
+        settings["threads"] = int(override)
+    if not settings["threads"]:
+        settings["threads"] = os.cpu_count() or 1
+
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(settings["threads"])
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    return settings
+
+
+def limit_torch_threads(settings: dict):
+    """Cap torch intra-op threads used by the SentenceTransformer encoder."""
+    import torch
+
+    torch.set_num_threads(settings["threads"])
+
+
+def build_cluster_models(settings: dict, min_topic_size: int):
+    """
+    Build UMAP and HDBSCAN models with BERTopic's default parameters,
+    limited to the stage's thread budget.
+    """
+    from hdbscan import HDBSCAN
+    from umap import UMAP
+
+    umap_model = UMAP(
+        n_neighbors=15,
+        n_components=5,
+        min_dist=0.0,
+        metric="cosine",
+        random_state=UMAP_RANDOM_STATE if settings["umap_deterministic"] else None,
+        n_jobs=1 if settings["umap_deterministic"] else settings["threads"],
+        low_memory=settings["low_memory"],
+    )
+    hdbscan_model = HDBSCAN(
+        min_cluster_size=min_topic_size,
+        metric="euclidean",
+        cluster_selection_method="eom",
+        prediction_data=True,
+        core_dist_n_jobs=settings["threads"],
+    )
+    return umap_model, hdbscan_model
+
+
+def sample_mode() -> bool:
+    """True when the pipeline should run on the stratified sample (PIPELINE_SAMPLE=1)."""
+    return os.environ.get("PIPELINE_SAMPLE", "") not in ("", "0")
+
+
+def stage_path(path) -> Path:
+    """Redirect a data/, visuals/ or models/ path under sample/ in sample mode."""
+    path = Path(path)
+    if not sample_mode():
+        return path
+    return Path(path.parts[0], "sample", *path.parts[1:])